@@ -1,27 +1,97 @@
 from __future__ import annotations
 
+import asyncio
+import heapq
+import itertools
 import logging
+import math
 from dataclasses import dataclass
 
 import httpx
 
 from app.config import TargetConfig
 from app.notifier import TelegramNotifier
+from app.resolver import caching_resolver_transport
 
 logger = logging.getLogger(__name__)
 
+# Servers answering HEAD with these codes are re-probed with GET.
+_HEAD_UNSUPPORTED_STATUSES = frozenset({405, 501})
 
-@dataclass
+# Every STABLE_STREAK_STEP consecutive successes double a target's probe interval, up to MAX_BACKOFF_FACTOR.
+STABLE_STREAK_STEP = 10
+MAX_BACKOFF_FACTOR = 8
+
+# Shared by the log record and the Telegram alert; the first argument is the checker name prefix.
+_RECOVERED_TEMPLATE = "%s[RECOVERED] %s is back online: %s"
+_DOWN_TEMPLATE = "%s[DOWN] %s is unavailable: %s. Response: %s. Failures: %s/%s"
+
+# Probes never read the body, so ask servers not to compress it.
+_PROBE_HEADERS = {"accept-encoding": "identity", "user-agent": "checker/1.0"}
+
+
+@dataclass(slots=True)
 class TargetState:
     consecutive_failures: int = 0
     is_down: bool = False
+    stable_streak: int = 0
+
+
+class TargetRuntime:
+    __slots__ = ("config", "state", "timeout", "next_probe_at")
+
+    def __init__(
+        self,
+        config: TargetConfig,
+        state: TargetState,
+        timeout: httpx.Timeout,
+        next_probe_at: float,
+    ) -> None:
+        self.config = config
+        self.state = state
+        self.timeout = timeout
+        self.next_probe_at = next_probe_at
 
 
 class AvailabilityChecker:
-    def __init__(self, notifier: TelegramNotifier, checker_name: str | None = None) -> None:
+    def __init__(
+        self,
+        notifier: TelegramNotifier,
+        checker_name: str | None = None,
+        max_concurrency: int = 20,
+        interval_seconds: float = 60.0,
+        dns_cache_ttl_seconds: float = 60.0,
+    ) -> None:
         self._notifier = notifier
-        self._states: dict[str, TargetState] = {}
+        self._runtimes: list[TargetRuntime] = []
+        self._schedule: list[tuple[float, int, TargetRuntime]] = []
+        self._schedule_order = itertools.count()
+        self._interval_seconds = interval_seconds
+        self._dns_cache_ttl_seconds = dns_cache_ttl_seconds
         self._checker_name = checker_name
+        self._max_concurrency = max_concurrency
+        self._timeouts: dict[float, httpx.Timeout] = {}
+        self._client = self._build_client()
+
+    def _build_client(self) -> httpx.AsyncClient:
+        # Keep idle connections alive past the longest backed-off interval so stable targets reuse them.
+        keepalive_expiry = self._interval_seconds * MAX_BACKOFF_FACTOR + 5
+        limits = httpx.Limits(
+            max_keepalive_connections=100,
+            max_connections=200,
+            keepalive_expiry=keepalive_expiry,
+        )
+        return httpx.AsyncClient(
+            http2=True,
+            limits=limits,
+            follow_redirects=False,
+            timeout=httpx.Timeout(5.0),
+            headers=_PROBE_HEADERS,
+            transport=caching_resolver_transport(ttl_seconds=self._dns_cache_ttl_seconds, http2=True, limits=limits),
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
 
     def set_notifier(self, notifier: TelegramNotifier) -> None:
         self._notifier = notifier
@@ -29,37 +99,133 @@ class AvailabilityChecker:
     def set_checker_name(self, checker_name: str | None) -> None:
         self._checker_name = checker_name
 
+    def set_targets(self, enabled_targets: tuple[TargetConfig, ...]) -> None:
+        now = asyncio.get_running_loop().time()
+        # State is shared per url, so targets repeating a url keep one consistent state across reloads.
+        states: dict[str, TargetState] = {}
+        next_probe_times: dict[str, float] = {}
+        for runtime in self._runtimes:
+            states.setdefault(runtime.config.url, runtime.state)
+            next_probe_times.setdefault(runtime.config.url, runtime.next_probe_at)
+        runtimes: list[TargetRuntime] = []
+        for target in enabled_targets:
+            runtimes.append(
+                TargetRuntime(
+                    config=target,
+                    state=states.setdefault(target.url, TargetState()),
+                    timeout=self._timeout_for(target),
+                    next_probe_at=next_probe_times.get(target.url, now),
+                )
+            )
+        self._runtimes = runtimes
+        self._rebuild_schedule()
+
+    def _rebuild_schedule(self) -> None:
+        self._schedule = [
+            (runtime.next_probe_at, next(self._schedule_order), runtime) for runtime in self._runtimes
+        ]
+        heapq.heapify(self._schedule)
+
+    async def _rebuild_client(self) -> None:
+        previous_client = self._client
+        self._client = self._build_client()
+        await previous_client.aclose()
+
+    async def set_interval_seconds(self, interval_seconds: float) -> None:
+        self._interval_seconds = interval_seconds
+        # Pull deadlines planned with the old interval in, so a shorter interval takes effect right away.
+        now = asyncio.get_running_loop().time()
+        for runtime in self._runtimes:
+            runtime.next_probe_at = min(runtime.next_probe_at, now + self._effective_interval(runtime.state))
+        self._rebuild_schedule()
+        await self._rebuild_client()
+
+    async def set_dns_cache_ttl_seconds(self, dns_cache_ttl_seconds: float) -> None:
+        self._dns_cache_ttl_seconds = dns_cache_ttl_seconds
+        await self._rebuild_client()
+
+    def set_max_concurrency(self, max_concurrency: int) -> None:
+        self._max_concurrency = max_concurrency
+
     def _message_prefix(self) -> str:
         if not self._checker_name:
             return ""
         return f"[{self._checker_name}] "
 
-    async def check_targets(self, targets: list[TargetConfig]) -> None:
-        enabled_targets = [target for target in targets if target.enabled]
-        if not enabled_targets:
+    def seconds_until_next_probe(self) -> float:
+        if not self._schedule:
+            return math.inf
+        return max(0.0, self._schedule[0][0] - asyncio.get_running_loop().time())
+
+    def _effective_interval(self, state: TargetState) -> float:
+        factor = min(MAX_BACKOFF_FACTOR, 1 << (state.stable_streak // STABLE_STREAK_STEP))
+        return self._interval_seconds * factor
+
+    async def check_due_targets(self) -> None:
+        if not self._runtimes:
             logger.warning("No enabled targets found in config")
             return
 
-        for target in enabled_targets:
-            await self._check_target(target)
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        runtimes: list[TargetRuntime] = []
+        while self._schedule and self._schedule[0][0] <= now:
+            runtimes.append(heapq.heappop(self._schedule)[2])
+        if not runtimes:
+            return
 
-    async def _check_target(self, target: TargetConfig) -> None:
-        state_key = target.url
-        state = self._states.setdefault(state_key, TargetState())
-        is_ok, reason = await self._request_status(target)
+        await self._check_runtimes(runtimes)
+
+        finished_at = loop.time()
+        behind_schedule = 0
+        for runtime in runtimes:
+            interval = self._effective_interval(runtime.state)
+            next_probe_at = runtime.next_probe_at + interval
+            if finished_at - next_probe_at > interval:
+                behind_schedule += 1
+                next_probe_at = finished_at + interval
+            runtime.next_probe_at = next_probe_at
+            heapq.heappush(self._schedule, (next_probe_at, next(self._schedule_order), runtime))
+        if behind_schedule:
+            logger.warning(
+                "%s target(s) more than one interval behind schedule, skipping missed probes",
+                behind_schedule,
+            )
+
+    async def _check_runtimes(self, runtimes: list[TargetRuntime]) -> None:
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        results = await asyncio.gather(
+            *(self._guarded_check(semaphore, runtime) for runtime in runtimes),
+            return_exceptions=True,
+        )
+        for runtime, result in zip(runtimes, results):
+            if isinstance(result, Exception):
+                target = runtime.config
+                logger.error("Check of %s (%s) failed", target.name, target.url, exc_info=result)
+
+    async def _guarded_check(self, semaphore: asyncio.Semaphore, runtime: TargetRuntime) -> None:
+        async with semaphore:
+            await self._check_target(runtime)
+
+    async def _check_target(self, runtime: TargetRuntime) -> None:
+        target = runtime.config
+        state = runtime.state
+        is_ok, reason = await self._request_status(runtime)
 
         if is_ok:
+            state.stable_streak += 1
             if state.is_down:
                 state.is_down = False
                 state.consecutive_failures = 0
-                message = f"{self._message_prefix()}[RECOVERED] {target.name} is back online: {target.url}"
-                logger.info(message)
-                await self._notifier.send(message)
+                recovered_args = (self._message_prefix(), target.name, target.url)
+                logger.info(_RECOVERED_TEMPLATE, *recovered_args)
+                self._notifier.send_batched(_RECOVERED_TEMPLATE % recovered_args)
             else:
                 state.consecutive_failures = 0
             return
 
         state.consecutive_failures += 1
+        state.stable_streak = 0
         logger.warning(
             "[FAIL] %s (%s): %s (failures %s/%s)",
             target.name,
@@ -72,19 +238,32 @@ class AvailabilityChecker:
         if not state.is_down and state.consecutive_failures >= target.failure_threshold:
             state.is_down = True
             response_info = reason if reason.startswith("status_code=") else f"error={reason}"
-            message = (
-                f"{self._message_prefix()}[DOWN] {target.name} is unavailable: {target.url}. "
-                f"Response: {response_info}. Failures: {state.consecutive_failures}/{target.failure_threshold}"
+            down_args = (
+                self._message_prefix(),
+                target.name,
+                target.url,
+                response_info,
+                state.consecutive_failures,
+                target.failure_threshold,
             )
-            logger.error(message)
-            await self._notifier.send(message)
+            logger.error(_DOWN_TEMPLATE, *down_args)
+            self._notifier.send_batched(_DOWN_TEMPLATE % down_args)
+
+    def _timeout_for(self, target: TargetConfig) -> httpx.Timeout:
+        timeout = self._timeouts.get(target.timeout_seconds)
+        if timeout is None:
+            timeout = self._timeouts[target.timeout_seconds] = httpx.Timeout(target.timeout_seconds)
+        return timeout
 
-    async def _request_status(self, target: TargetConfig) -> tuple[bool, str]:
+    async def _request_status(self, runtime: TargetRuntime) -> tuple[bool, str]:
+        target = runtime.config
+        timeout = runtime.timeout
         try:
-            async with httpx.AsyncClient(timeout=target.timeout_seconds, follow_redirects=True) as client:
-                response = await client.get(target.url)
-            if response.status_code == 200:
-                return True, "status_code=200"
-            return False, f"status_code={response.status_code}"
+            async with self._client.stream("HEAD", target.url, timeout=timeout) as response:
+                status_code = response.status_code
+            if status_code in _HEAD_UNSUPPORTED_STATUSES:
+                async with self._client.stream("GET", target.url, timeout=timeout) as response:
+                    status_code = response.status_code
+            return 200 <= status_code < 400, f"status_code={status_code}"
         except Exception as exc:
             return False, f"{type(exc).__name__}: {exc}"
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 from urllib.parse import urlparse
 
+import orjson
+
+# Plain ASCII hosts only; brackets, non-ASCII and other edge cases go through urlparse.
+_URL_FAST_PATH = re.compile(r"^https?://[A-Za-z0-9._~%!$&'()*+,;=:@-]+(?:[/?#]|$)")
+
 
 @dataclass(frozen=True)
 class TelegramConfig:
@@ -17,6 +23,8 @@ class GlobalDefaults:
     interval_seconds: int = 60
     timeout_seconds: float = 5.0
     failure_threshold: int = 1
+    max_concurrency: int = 20
+    dns_cache_ttl_seconds: float = 60.0
 
 
 @dataclass(frozen=True)
@@ -34,15 +42,27 @@ class AppConfig:
     defaults: GlobalDefaults
     targets: list[TargetConfig]
     checker_name: str | None = None
+    enabled_targets: tuple[TargetConfig, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "enabled_targets", tuple(target for target in self.targets if target.enabled))
 
 
 def _validate_url(value: str) -> str:
+    if _URL_FAST_PATH.match(value):
+        return value
     parsed = urlparse(value)
     if parsed.scheme not in {"http", "https"} or not parsed.netloc:
         raise ValueError(f"Invalid URL: {value}")
     return value
 
 
+def _clean_str(value: Any) -> str:
+    if isinstance(value, str):
+        return value.strip()
+    return str(value).strip()
+
+
 def _require_positive_number(name: str, value: int | float) -> int | float:
     if value <= 0:
         raise ValueError(f"{name} must be > 0, got {value}")
@@ -51,11 +71,11 @@ def _require_positive_number(name: str, value: int | float) -> int | float:
 
 def load_config(path: str | Path = "config.json") -> AppConfig:
     config_path = Path(path)
-    raw = json.loads(config_path.read_text(encoding="utf-8"))
+    raw = orjson.loads(config_path.read_bytes())
 
     telegram_raw = raw.get("telegram") or {}
-    bot_token = str(telegram_raw.get("bot_token", "")).strip()
-    chat_id = str(telegram_raw.get("chat_id", "")).strip()
+    bot_token = _clean_str(telegram_raw.get("bot_token", ""))
+    chat_id = _clean_str(telegram_raw.get("chat_id", ""))
     if not bot_token or not chat_id:
         raise ValueError("telegram.bot_token and telegram.chat_id are required")
     telegram = TelegramConfig(bot_token=bot_token, chat_id=chat_id)
@@ -67,12 +87,20 @@ def load_config(path: str | Path = "config.json") -> AppConfig:
         failure_threshold=int(
             _require_positive_number("failure_threshold", int(defaults_raw.get("failure_threshold", 1)))
         ),
+        max_concurrency=int(
+            _require_positive_number("max_concurrency", int(defaults_raw.get("max_concurrency", 20)))
+        ),
+        dns_cache_ttl_seconds=float(
+            _require_positive_number(
+                "dns_cache_ttl_seconds", float(defaults_raw.get("dns_cache_ttl_seconds", 60))
+            )
+        ),
     )
 
     checker_name_raw = raw.get("checker_name")
     checker_name = None
     if checker_name_raw is not None:
-        checker_name = str(checker_name_raw).strip() or None
+        checker_name = _clean_str(checker_name_raw) or None
 
     targets_raw = raw.get("targets")
     if not isinstance(targets_raw, list) or not targets_raw:
@@ -82,8 +110,8 @@ def load_config(path: str | Path = "config.json") -> AppConfig:
     for index, item in enumerate(targets_raw):
         if not isinstance(item, dict):
             raise ValueError(f"targets[{index}] must be an object")
-        name = str(item.get("name", "")).strip() or f"target-{index + 1}"
-        url = _validate_url(str(item.get("url", "")).strip())
+        name = _clean_str(item.get("name", "")) or f"target-{index + 1}"
+        url = _validate_url(_clean_str(item.get("url", "")))
         enabled = bool(item.get("enabled", True))
 
         timeout_seconds = float(item.get("timeout_seconds", defaults.timeout_seconds))
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 import logging
+import os
+import queue
 import signal
-from glob import glob
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
 
 from app.checker import AvailabilityChecker
@@ -25,14 +27,20 @@ class DailyLogHandler(TimedRotatingFileHandler):
         if self.backupCount <= 0:
             return []
         base_path = Path(self.baseFilename)
-        pattern = str(base_path.with_name(f"{base_path.stem}-*{base_path.suffix}"))
-        candidates = sorted(glob(pattern))
+        prefix = f"{base_path.stem}-"
+        with os.scandir(base_path.parent) as entries:
+            candidates = [
+                entry.name
+                for entry in entries
+                if entry.name.startswith(prefix) and entry.name.endswith(base_path.suffix)
+            ]
         if len(candidates) <= self.backupCount:
             return []
-        return candidates[: len(candidates) - self.backupCount]
+        oldest = heapq.nsmallest(len(candidates) - self.backupCount, candidates)
+        return [str(base_path.with_name(name)) for name in oldest]
 
 
-def setup_logging() -> None:
+def setup_logging() -> QueueListener:
     log_dir = Path("/logs")
     log_dir.mkdir(parents=True, exist_ok=True)
     file_handler = DailyLogHandler(
@@ -47,13 +55,29 @@ def setup_logging() -> None:
     formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
     file_handler.setFormatter(formatter)
     stream_handler.setFormatter(formatter)
-    logging.basicConfig(level=logging.INFO, handlers=[stream_handler, file_handler])
+    # Handlers run on the listener thread so the event loop never blocks on log I/O.
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+    # Attach the QueueHandler directly: basicConfig would give it a formatter and records would be formatted twice.
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(QueueHandler(log_queue))
+    listener.start()
+    return listener
 
 
 async def run_service() -> None:
+    config_mtime: int | None = os.stat("config.json").st_mtime_ns
     config = load_config("config.json")
     notifier = TelegramNotifier(config.telegram)
-    checker = AvailabilityChecker(notifier, checker_name=config.checker_name)
+    checker = AvailabilityChecker(
+        notifier,
+        checker_name=config.checker_name,
+        max_concurrency=config.defaults.max_concurrency,
+        interval_seconds=config.defaults.interval_seconds,
+        dns_cache_ttl_seconds=config.defaults.dns_cache_ttl_seconds,
+    )
+    checker.set_targets(config.enabled_targets)
 
     logger.info("Service started. Interval: %s seconds", config.defaults.interval_seconds)
 
@@ -69,38 +93,63 @@ async def run_service() -> None:
 
     while not stop_event.is_set():
         try:
-            fresh_config = load_config("config.json")
+            try:
+                current_mtime = os.stat("config.json").st_mtime_ns
+            except OSError:
+                current_mtime = None
+            if current_mtime == config_mtime:
+                fresh_config = config
+            else:
+                fresh_config = load_config("config.json")
+                config_mtime = current_mtime
             if fresh_config != config:
                 if fresh_config.telegram != config.telegram:
-                    checker.set_notifier(TelegramNotifier(fresh_config.telegram))
+                    previous_notifier = notifier
+                    notifier = TelegramNotifier(fresh_config.telegram)
+                    checker.set_notifier(notifier)
+                    await previous_notifier.aclose()
                     logger.info("Telegram notifier config reloaded")
                 if fresh_config.checker_name != config.checker_name:
                     checker.set_checker_name(fresh_config.checker_name)
                     logger.info("Checker name config reloaded")
+                if fresh_config.defaults.max_concurrency != config.defaults.max_concurrency:
+                    checker.set_max_concurrency(fresh_config.defaults.max_concurrency)
+                    logger.info("Max concurrency config reloaded")
+                if fresh_config.defaults.interval_seconds != config.defaults.interval_seconds:
+                    await checker.set_interval_seconds(fresh_config.defaults.interval_seconds)
+                    logger.info("Interval config reloaded")
+                if fresh_config.defaults.dns_cache_ttl_seconds != config.defaults.dns_cache_ttl_seconds:
+                    await checker.set_dns_cache_ttl_seconds(fresh_config.defaults.dns_cache_ttl_seconds)
+                    logger.info("DNS cache TTL config reloaded")
+                if fresh_config.enabled_targets != config.enabled_targets:
+                    checker.set_targets(fresh_config.enabled_targets)
                 config = fresh_config
                 logger.info("Config reloaded from config.json")
         except Exception:
             logger.exception("Failed to reload config.json. Using previous valid config.")
 
-        started_at = loop.time()
-        await checker.check_targets(config.targets)
-        elapsed = loop.time() - started_at
-        sleep_for = max(0.0, config.defaults.interval_seconds - elapsed)
+        await checker.check_due_targets()
+        # Wake at least once per base interval so config changes are noticed while targets are backed off.
+        sleep_for = min(checker.seconds_until_next_probe(), config.defaults.interval_seconds)
         try:
             await asyncio.wait_for(stop_event.wait(), timeout=sleep_for)
         except TimeoutError:
             pass
 
+    await checker.aclose()
+    await notifier.aclose()
     logger.info("Service stopped")
 
 
 def main() -> None:
-    setup_logging()
+    listener = setup_logging()
     try:
         asyncio.run(run_service())
     except Exception:
         logger.exception("Service crashed")
         raise
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
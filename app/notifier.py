@@ -1,24 +1,75 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 
 import httpx
+import orjson
 
 from app.config import TelegramConfig
 
 logger = logging.getLogger(__name__)
 
+BATCH_WINDOW_SECONDS = 0.5
+# Telegram rejects sendMessage texts longer than this.
+MAX_MESSAGE_LENGTH = 4096
+_JSON_HEADERS = {"content-type": "application/json"}
+
+
+def _pack_messages(messages: list[str]) -> list[str]:
+    packed: list[str] = []
+    current = ""
+    for message in messages:
+        if current and len(current) + 1 + len(message) > MAX_MESSAGE_LENGTH:
+            packed.append(current)
+            current = message
+        else:
+            current = f"{current}\n{message}" if current else message
+    if current:
+        packed.append(current)
+    return packed
+
 
 class TelegramNotifier:
     def __init__(self, config: TelegramConfig) -> None:
         self._config = config
         self._url = f"https://api.telegram.org/bot{config.bot_token}/sendMessage"
+        self._base_payload = {"chat_id": config.chat_id}
+        self._client = httpx.AsyncClient(http2=True, timeout=10.0)
+        self._buffer: list[str] = []
+        self._flush_task: asyncio.Task[None] | None = None
+        self._pending_flushes: set[asyncio.Task[None]] = set()
+
+    async def aclose(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await asyncio.gather(*self._pending_flushes, return_exceptions=True)
+        await self._flush()
+        await self._client.aclose()
+
+    def send_batched(self, message: str) -> None:
+        self._buffer.append(message)
+        if self._flush_task is None:
+            task = asyncio.create_task(self._flush_after(BATCH_WINDOW_SECONDS))
+            self._flush_task = task
+            self._pending_flushes.add(task)
+            task.add_done_callback(self._pending_flushes.discard)
+
+    async def _flush_after(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        messages, self._buffer = self._buffer, []
+        for text in _pack_messages(messages):
+            await self.send(text)
 
     async def send(self, message: str) -> bool:
-        payload = {"chat_id": self._config.chat_id, "text": message}
+        body = orjson.dumps({**self._base_payload, "text": message})
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(self._url, json=payload)
+            response = await self._client.post(self._url, content=body, headers=_JSON_HEADERS)
             response.raise_for_status()
             data = response.json()
             if not data.get("ok", False):
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+import typing
+from collections import OrderedDict
+from urllib.request import getproxies
+
+import httpcore
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DNS_CACHE_SIZE = 256
+
+
+class CachingResolverBackend(httpcore.AsyncNetworkBackend):
+    def __init__(
+        self,
+        backend: httpcore.AsyncNetworkBackend,
+        ttl_seconds: float,
+        max_entries: int = DEFAULT_DNS_CACHE_SIZE,
+    ) -> None:
+        self._backend = backend
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._cache: OrderedDict[tuple[str, int], tuple[tuple[str, ...], float]] = OrderedDict()
+
+    async def _resolve(self, host: str, port: int) -> tuple[str, ...]:
+        try:
+            ipaddress.ip_address(host)
+            return (host,)
+        except ValueError:
+            pass
+
+        key = (host, port)
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None and cached[1] > now:
+            self._cache.move_to_end(key)
+            return cached[0]
+
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except OSError as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+        # Keep every record in resolver order so an unreachable first address does not fail the probe.
+        addresses = tuple(dict.fromkeys(str(info[4][0]) for info in infos))
+        if not addresses:
+            raise httpcore.ConnectError(f"No addresses found for {host}")
+
+        self._cache[key] = (addresses, now + self._ttl_seconds)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+        return addresses
+
+    def _prefer_address(self, key: tuple[str, int], address: str) -> None:
+        cached = self._cache.get(key)
+        if cached is None:
+            return
+        addresses, expires_at = cached
+        self._cache[key] = ((address, *(item for item in addresses if item != address)), expires_at)
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: typing.Iterable[httpcore.SOCKET_OPTION] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        # TLS SNI and the Host header come from the request origin, so connecting by IP is safe.
+        addresses = await self._resolve(host, port)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        last_error: Exception | None = None
+        for index, address in enumerate(addresses):
+            attempt_timeout = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Split what is left between the remaining addresses so a blackholed record cannot use it all.
+                attempt_timeout = remaining / (len(addresses) - index)
+            try:
+                stream = await self._backend.connect_tcp(
+                    address,
+                    port,
+                    timeout=attempt_timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                last_error = exc
+                continue
+            if index:
+                self._prefer_address((host, port), address)
+            return stream
+
+        # Every address failed; forget them so the next attempt resolves the host again.
+        self._cache.pop((host, port), None)
+        if last_error is not None:
+            raise last_error
+        raise httpcore.ConnectTimeout(f"Timed out connecting to {host}:{port}")
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: float | None = None,
+        socket_options: typing.Iterable[httpcore.SOCKET_OPTION] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+def caching_resolver_transport(
+    ttl_seconds: float,
+    **transport_kwargs: typing.Any,
+) -> httpx.AsyncHTTPTransport | None:
+    # A custom transport disables httpx's HTTP(S)_PROXY handling, so leave proxied setups to httpx.
+    proxies = getproxies()
+    if "http" in proxies or "https" in proxies or "all" in proxies:
+        logger.info("Proxy configured in environment, DNS cache for probes is disabled")
+        return None
+
+    transport = httpx.AsyncHTTPTransport(**transport_kwargs)
+    # httpx does not expose the pool's network backend, so wrap the one httpcore created.
+    pool = getattr(transport, "_pool", None)
+    backend = getattr(pool, "_network_backend", None)
+    if pool is None or not isinstance(backend, httpcore.AsyncNetworkBackend):
+        logger.warning("Unsupported httpx/httpcore version, DNS cache for probes is disabled")
+        return transport
+    pool._network_backend = CachingResolverBackend(backend, ttl_seconds=ttl_seconds)
+    return transport